@@ -0,0 +1,28 @@
+from typing import Any, List
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renders JSON using `orjson`, a lot faster than the standard library `json` used
+    by DRF `JSONRenderer`. Keys are not camelized and only native types are
+    supported (sets are rendered as lists), so it's meant for endpoints returning
+    simple structures
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        return orjson.dumps(data, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+
+    @staticmethod
+    def default(obj: Any) -> List[Any]:
+        if isinstance(obj, (set, frozenset)):
+            return sorted(obj)
+        raise TypeError
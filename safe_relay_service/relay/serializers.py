@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 
 from django.conf import settings
 
@@ -27,6 +28,17 @@ from .services import StatsServiceProvider
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def get_address_from_private_key(private_key: str) -> str:
+    """
+    Deriving the address from the private key is expensive and keys from settings
+    don't change, so result is cached
+    :param private_key:
+    :return: Checksummed address for the private key
+    """
+    return Account.from_key(private_key).address
+
+
 class ThresholdValidatorSerializerMixin:
     def validate(self, data):
         super().validate(data)
@@ -78,9 +90,9 @@ class SafeRelayMultisigTxSerializer(SafeMultisigTxSerializer):
     signatures = serializers.ListField(child=SafeSignatureSerializer())
 
     def validate_refund_receiver(self, refund_receiver):
-        relay_sender_address = Account.from_key(
+        relay_sender_address = get_address_from_private_key(
             settings.SAFE_TX_SENDER_PRIVATE_KEY
-        ).address
+        )
         if refund_receiver and refund_receiver not in (
             NULL_ADDRESS,
             relay_sender_address,
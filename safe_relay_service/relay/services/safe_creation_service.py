@@ -1,4 +1,3 @@
-import math
 from logging import getLogger
 from typing import Iterable, List, NoReturn, Optional
 
@@ -330,9 +329,11 @@ class SafeCreationService:
 
         setup_data = HexBytes(safe_creation2.setup_data.tobytes())
         proxy_factory = ProxyFactory(safe_creation2.proxy_factory, self.ethereum_client)
-        # Increase gas price a little
-        gas_price = math.ceil(
-            max(self.gas_station.get_gas_prices().fast, ethereum_tx.gas_price) * 1.1
+        # Increase gas price a little (10%), rounding up
+        gas_price = -(
+            -max(self.gas_station.get_gas_prices().fast, ethereum_tx.gas_price)
+            * 11
+            // 10
         )
         ethereum_tx_sent = proxy_factory.deploy_proxy_contract_with_nonce(
             self.funder_account,
@@ -390,7 +391,9 @@ class SafeCreationService:
         )
         safe_creation_estimates = [ether_creation_estimate]
         token_gas_difference = 50000  # 50K gas more expensive than ether
-        for token in Token.objects.gas_tokens():
+        tokens = list(Token.objects.gas_tokens().with_price_oracle_tickers())
+        Token.prefetch_eth_values(tokens)
+        for token in tokens:
             try:
                 safe_creation_estimates.append(
                     SafeCreationEstimate(
@@ -1,4 +1,3 @@
-import math
 from logging import getLogger
 from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
 
@@ -19,7 +18,6 @@ from gnosis.safe.signatures import signatures_to_bytes
 
 from safe_relay_service.gas_station.gas_station import GasStation, GasStationProvider
 from safe_relay_service.tokens.models import Token
-from safe_relay_service.tokens.price_oracles import CannotGetTokenPriceFromApi
 
 from ..models import (
     BannedSigner,
@@ -235,8 +233,12 @@ class TransactionService:
         else:
             estimated_gas_price = base_gas_price
 
-        # FIXME Remove 2 / 3, workaround to prevent frontrunning
-        return math.ceil(estimated_gas_price * 2 / 3)
+        return self._apply_gas_price_workaround(estimated_gas_price)
+
+    def _apply_gas_price_workaround(self, gas_price: int) -> int:
+        # FIXME Remove 2 / 3, workaround to prevent frontrunning. Ceil of the integer
+        # division, so big gas prices are not rounded as floats
+        return -(-gas_price * 2 // 3)
 
     def _get_configured_gas_price(self) -> int:
         """
@@ -342,18 +344,19 @@ class TransactionService:
             )
         ]
         token_gas_difference = 50000  # 50K gas more expensive than ether
-        for token in Token.objects.gas_tokens():
-            try:
-                gas_price = self._estimate_tx_gas_price(base_gas_price, token.address)
+        tokens = list(Token.objects.gas_tokens().with_price_oracle_tickers())
+        token_gas_prices = Token.calculate_gas_prices(tokens, base_gas_price)
+        for token, token_gas_price in zip(tokens, token_gas_prices):
+            if token_gas_price is None:
+                logger.error("Cannot get price for token=%s", token.address)
+            else:
                 gas_token_estimations.append(
                     TransactionGasTokenEstimation(
                         ether_safe_tx_base_gas + token_gas_difference,
-                        gas_price,
+                        self._apply_gas_price_workaround(token_gas_price),
                         token.address,
                     )
                 )
-            except CannotGetTokenPriceFromApi:
-                logger.error("Cannot get price for token=%s", token.address)
 
         return TransactionEstimationWithNonceAndGasTokens(
             last_used_nonce, safe_tx_gas, safe_tx_operational_gas, gas_token_estimations
@@ -514,7 +517,7 @@ class TransactionService:
         # We use fast tx gas price, if not txs could be stuck
         tx_gas_price = self._get_configured_gas_price()
         tx_sender_private_key = self.tx_sender_account.key
-        tx_sender_address = Account.from_key(tx_sender_private_key).address
+        tx_sender_address = self.tx_sender_account.address
 
         safe_tx = safe.build_multisig_tx(
             to,
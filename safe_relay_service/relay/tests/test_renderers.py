@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase
+
+import orjson
+from rest_framework.test import APIRequestFactory
+
+from ..renderers import ORJSONRenderer
+from ..views import AboutView
+
+
+class TestORJSONRenderer(SimpleTestCase):
+    def test_render(self):
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render(None), b"")
+        self.assertEqual(
+            orjson.loads(renderer.render({"a": 1, 2: {"b", "a"}})),
+            {"a": 1, "2": ["a", "b"]},
+        )
+        with self.assertRaises(TypeError):
+            renderer.render({"a": object()})
+
+    def test_render_about(self):
+        request = APIRequestFactory().get("/api/v1/about/")
+        response = AboutView.as_view()(request)
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        content = orjson.loads(response.content)
+        self.assertEqual(content["name"], "Safe Relay Service")
+        self.assertIsInstance(
+            content["settings"]["SAFE_VALID_CONTRACT_ADDRESSES"], list
+        )
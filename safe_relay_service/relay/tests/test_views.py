@@ -26,6 +26,7 @@ from .factories import (
     EthereumEventFactory,
     SafeContractFactory,
     SafeCreation2Factory,
+    SafeFundingFactory,
     SafeMultisigTxFactory,
 )
 from .relay_test_case import RelayTestCaseMixin
@@ -44,6 +45,8 @@ class TestViews(RelayTestCaseMixin, APITestCase):
     def test_about(self):
         response = self.client.get(reverse("v1:about"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json()["name"], "Safe Relay Service")
 
     def test_gas_station(self):
         response = self.client.get(reverse("v1:gas-station"))
@@ -110,6 +113,31 @@ class TestViews(RelayTestCaseMixin, APITestCase):
             ],
         )
 
+    def test_safe_signal(self):
+        invalid_address = get_eth_address_with_invalid_checksum()
+        response = self.client.get(reverse("v1:safe-signal", args=(invalid_address,)))
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        safe_address = Account.create().address
+        response = self.client.get(reverse("v1:safe-signal", args=(safe_address,)))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        safe_funding = SafeFundingFactory(
+            safe__address=safe_address, deployer_funded=True
+        )
+        response = self.client.get(reverse("v1:safe-signal", args=(safe_address,)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "safeFunded": safe_funding.safe_funded,
+                "deployerFunded": True,
+                "deployerFundedTxHash": None,
+                "safeDeployed": False,
+                "safeDeployedTxHash": None,
+            },
+        )
+
     def test_safe_multisig_tx_post(self):
         # Create Safe ------------------------------------------------
         w3 = self.ethereum_client.w3
@@ -1,4 +1,6 @@
 import logging
+from functools import cache
+from typing import Any, Dict
 
 from django.conf import settings
 from django.utils.dateparse import parse_datetime
@@ -7,11 +9,11 @@ from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from eth_account.account import Account
+from hexbytes import HexBytes
 from rest_framework import filters, status
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.generics import CreateAPIView, ListAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView, exception_handler
 from web3 import Web3
@@ -24,6 +26,7 @@ from safe_relay_service.version import __version__
 
 from .filters import DefaultPagination, SafeMultisigTxFilter
 from .models import EthereumEvent, SafeContract, SafeFunding, SafeMultisigTx
+from .renderers import ORJSONRenderer
 from .serializers import (
     ERC20Serializer,
     ERC721Serializer,
@@ -90,9 +93,15 @@ def custom_exception_handler(exc, context):
 
 
 class AboutView(APIView):
-    renderer_classes = (JSONRenderer,)
+    renderer_classes = (ORJSONRenderer,)
 
-    def get(self, request, format=None):
+    @staticmethod
+    @cache
+    def get_settings_content() -> Dict[str, Any]:
+        """
+        Settings don't change while the process is running, so they are only built
+        once (deriving public keys from the private keys is not cheap)
+        """
         safe_funder_public_key = (
             Account.from_key(settings.SAFE_FUNDER_PRIVATE_KEY).address
             if settings.SAFE_FUNDER_PRIVATE_KEY
@@ -103,36 +112,41 @@ class AboutView(APIView):
             if settings.SAFE_TX_SENDER_PRIVATE_KEY
             else None
         )
+        return {
+            "ETHEREUM_NODE_URL": settings.ETHEREUM_NODE_URL,
+            "ETH_HASH_PREFIX ": settings.ETH_HASH_PREFIX,
+            "FIXED_GAS_PRICE": settings.FIXED_GAS_PRICE,
+            "GAS_STATION_NUMBER_BLOCKS": settings.GAS_STATION_NUMBER_BLOCKS,
+            "NOTIFICATION_SERVICE_PASS": bool(settings.NOTIFICATION_SERVICE_PASS),
+            "NOTIFICATION_SERVICE_URI": settings.NOTIFICATION_SERVICE_URI,
+            "SAFE_ACCOUNTS_BALANCE_WARNING": settings.SAFE_ACCOUNTS_BALANCE_WARNING,
+            "SAFE_CHECK_DEPLOYER_FUNDED_DELAY": settings.SAFE_CHECK_DEPLOYER_FUNDED_DELAY,
+            "SAFE_CHECK_DEPLOYER_FUNDED_RETRIES": settings.SAFE_CHECK_DEPLOYER_FUNDED_RETRIES,
+            "SAFE_DEFAULT_CALLBACK_HANDLER": settings.SAFE_DEFAULT_CALLBACK_HANDLER,
+            "SAFE_FIXED_CREATION_COST": settings.SAFE_FIXED_CREATION_COST,
+            "SAFE_FUNDER_MAX_ETH": settings.SAFE_FUNDER_MAX_ETH,
+            "SAFE_FUNDER_PUBLIC_KEY": safe_funder_public_key,
+            "SAFE_FUNDING_CONFIRMATIONS": settings.SAFE_FUNDING_CONFIRMATIONS,
+            "SAFE_PROXY_FACTORY_ADDRESS": settings.SAFE_PROXY_FACTORY_ADDRESS,
+            "SAFE_PROXY_FACTORY_V1_0_0_ADDRESS": settings.SAFE_PROXY_FACTORY_V1_0_0_ADDRESS,
+            "SAFE_TX_NOT_MINED_ALERT_MINUTES": settings.SAFE_TX_NOT_MINED_ALERT_MINUTES,
+            "SAFE_TX_SENDER_PUBLIC_KEY": safe_sender_public_key,
+            "SAFE_V0_0_1_CONTRACT_ADDRESS": settings.SAFE_V0_0_1_CONTRACT_ADDRESS,
+            "SAFE_V1_0_0_CONTRACT_ADDRESS": settings.SAFE_V1_0_0_CONTRACT_ADDRESS,
+            "SAFE_V1_1_1_CONTRACT_ADDRESS": settings.SAFE_V1_1_1_CONTRACT_ADDRESS,
+            "SAFE_CONTRACT_ADDRESS": settings.SAFE_CONTRACT_ADDRESS,
+            "SAFE_VALID_CONTRACT_ADDRESSES": sorted(
+                settings.SAFE_VALID_CONTRACT_ADDRESSES
+            ),
+        }
+
+    def get(self, request, format=None):
         content = {
             "name": "Safe Relay Service",
             "version": __version__,
             "api_version": self.request.version,
             "https_detected": self.request.is_secure(),
-            "settings": {
-                "ETHEREUM_NODE_URL": settings.ETHEREUM_NODE_URL,
-                "ETH_HASH_PREFIX ": settings.ETH_HASH_PREFIX,
-                "FIXED_GAS_PRICE": settings.FIXED_GAS_PRICE,
-                "GAS_STATION_NUMBER_BLOCKS": settings.GAS_STATION_NUMBER_BLOCKS,
-                "NOTIFICATION_SERVICE_PASS": bool(settings.NOTIFICATION_SERVICE_PASS),
-                "NOTIFICATION_SERVICE_URI": settings.NOTIFICATION_SERVICE_URI,
-                "SAFE_ACCOUNTS_BALANCE_WARNING": settings.SAFE_ACCOUNTS_BALANCE_WARNING,
-                "SAFE_CHECK_DEPLOYER_FUNDED_DELAY": settings.SAFE_CHECK_DEPLOYER_FUNDED_DELAY,
-                "SAFE_CHECK_DEPLOYER_FUNDED_RETRIES": settings.SAFE_CHECK_DEPLOYER_FUNDED_RETRIES,
-                "SAFE_DEFAULT_CALLBACK_HANDLER": settings.SAFE_DEFAULT_CALLBACK_HANDLER,
-                "SAFE_FIXED_CREATION_COST": settings.SAFE_FIXED_CREATION_COST,
-                "SAFE_FUNDER_MAX_ETH": settings.SAFE_FUNDER_MAX_ETH,
-                "SAFE_FUNDER_PUBLIC_KEY": safe_funder_public_key,
-                "SAFE_FUNDING_CONFIRMATIONS": settings.SAFE_FUNDING_CONFIRMATIONS,
-                "SAFE_PROXY_FACTORY_ADDRESS": settings.SAFE_PROXY_FACTORY_ADDRESS,
-                "SAFE_PROXY_FACTORY_V1_0_0_ADDRESS": settings.SAFE_PROXY_FACTORY_V1_0_0_ADDRESS,
-                "SAFE_TX_NOT_MINED_ALERT_MINUTES": settings.SAFE_TX_NOT_MINED_ALERT_MINUTES,
-                "SAFE_TX_SENDER_PUBLIC_KEY": safe_sender_public_key,
-                "SAFE_V0_0_1_CONTRACT_ADDRESS": settings.SAFE_V0_0_1_CONTRACT_ADDRESS,
-                "SAFE_V1_0_0_CONTRACT_ADDRESS": settings.SAFE_V1_0_0_CONTRACT_ADDRESS,
-                "SAFE_V1_1_1_CONTRACT_ADDRESS": settings.SAFE_V1_1_1_CONTRACT_ADDRESS,
-                "SAFE_CONTRACT_ADDRESS": settings.SAFE_CONTRACT_ADDRESS,
-                "SAFE_VALID_CONTRACT_ADDRESSES": settings.SAFE_VALID_CONTRACT_ADDRESSES,
-            },
+            "settings": self.get_settings_content(),
         }
         return Response(content)
 
@@ -155,41 +169,40 @@ class SafeCreationView(CreateAPIView):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             s, owners, threshold, payment_token = (
-                serializer.data["s"],
-                serializer.data["owners"],
-                serializer.data["threshold"],
-                serializer.data["payment_token"],
+                serializer.validated_data["s"],
+                serializer.validated_data["owners"],
+                serializer.validated_data["threshold"],
+                serializer.validated_data["payment_token"],
             )
 
             safe_creation = SafeCreationServiceProvider().create_safe_tx(
                 s, owners, threshold, payment_token
             )
-            safe_creation_response_data = SafeCreationResponseSerializer(
+            # Response is built directly, `SafeCreationResponseSerializer` is only used
+            # for documentation. Big integers are returned as strings for JavaScript
+            return Response(
+                status=status.HTTP_201_CREATED,
                 data={
                     "signature": {
-                        "v": safe_creation.v,
-                        "r": safe_creation.r,
-                        "s": safe_creation.s,
+                        "v": str(safe_creation.v),
+                        "r": str(safe_creation.r),
+                        "s": str(safe_creation.s),
                     },
                     "tx": {
                         "from": safe_creation.deployer,
                         "value": safe_creation.value,
                         "data": safe_creation.data.hex(),
-                        "gas": safe_creation.gas,
-                        "gas_price": safe_creation.gas_price,
+                        "gas": str(safe_creation.gas),
+                        "gas_price": str(safe_creation.gas_price),
                         "nonce": 0,
                     },
-                    "tx_hash": safe_creation.tx_hash,
-                    "payment": safe_creation.payment,
+                    "tx_hash": HexBytes(safe_creation.tx_hash).hex(),
+                    "payment": str(safe_creation.payment),
                     "payment_token": safe_creation.payment_token or NULL_ADDRESS,
                     "safe": safe_creation.safe.address,
                     "deployer": safe_creation.deployer,
                     "funder": safe_creation.funder,
-                }
-            )
-            safe_creation_response_data.is_valid(raise_exception=True)
-            return Response(
-                status=status.HTTP_201_CREATED, data=safe_creation_response_data.data
+                },
             )
         else:
             http_status = (
@@ -256,6 +269,7 @@ class SafeBalanceView(APIView):
 
 
 class SafeSignalView(APIView):
+    authentication_classes = ()
     permission_classes = (AllowAny,)
 
     @swagger_auto_schema(
@@ -275,12 +289,28 @@ class SafeSignalView(APIView):
             return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY)
         else:
             try:
-                safe_funding = SafeFunding.objects.get(safe=address)
-                serializer = SafeFundingResponseSerializer(safe_funding)
-                return Response(status=status.HTTP_200_OK, data=serializer.data)
+                safe_funding = SafeFunding.objects.only(
+                    "safe_funded",
+                    "deployer_funded",
+                    "deployer_funded_tx_hash",
+                    "safe_deployed",
+                    "safe_deployed_tx_hash",
+                ).get(safe=address)
             except SafeFunding.DoesNotExist:
                 return Response(status=status.HTTP_404_NOT_FOUND)
 
+            # Fields of `SafeFundingResponseSerializer`, they don't need any conversion
+            return Response(
+                status=status.HTTP_200_OK,
+                data={
+                    "safe_funded": safe_funding.safe_funded,
+                    "deployer_funded": safe_funding.deployer_funded,
+                    "deployer_funded_tx_hash": safe_funding.deployer_funded_tx_hash,
+                    "safe_deployed": safe_funding.safe_deployed,
+                    "safe_deployed_tx_hash": safe_funding.safe_deployed_tx_hash,
+                },
+            )
+
     @swagger_auto_schema(
         deprecated=True,
         operation_description="Use /v2/safes/{address}/funded",
@@ -48,7 +48,7 @@ class SafeCreationEstimateView(CreateAPIView):
         """
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            number_owners = serializer.data["number_owners"]
+            number_owners = serializer.validated_data["number_owners"]
             safe_creation_estimates = SafeCreationV1_0_0ServiceProvider().estimate_safe_creation_for_all_tokens(
                 number_owners
             )
@@ -87,10 +87,10 @@ class SafeCreationView(CreateAPIView):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             salt_nonce, owners, threshold, payment_token = (
-                serializer.data["salt_nonce"],
-                serializer.data["owners"],
-                serializer.data["threshold"],
-                serializer.data["payment_token"],
+                serializer.validated_data["salt_nonce"],
+                serializer.validated_data["owners"],
+                serializer.validated_data["threshold"],
+                serializer.validated_data["payment_token"],
             )
 
             safe_creation_service = SafeCreationV1_0_0ServiceProvider()
@@ -161,6 +161,7 @@ class SafeMultisigTxEstimateView(CreateAPIView):
 
 
 class SafeSignalView(APIView):
+    authentication_classes = ()
     permission_classes = (AllowAny,)
     serializer_class = SafeFunding2ResponseSerializer
 
@@ -37,7 +37,7 @@ class SafeCreationEstimateView(CreateAPIView):
         """
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            number_owners = serializer.data["number_owners"]
+            number_owners = serializer.validated_data["number_owners"]
             safe_creation_estimates = (
                 SafeCreationServiceProvider().estimate_safe_creation_for_all_tokens(
                     number_owners
@@ -76,10 +76,10 @@ class SafeCreationView(CreateAPIView):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             salt_nonce, owners, threshold, payment_token = (
-                serializer.data["salt_nonce"],
-                serializer.data["owners"],
-                serializer.data["threshold"],
-                serializer.data["payment_token"],
+                serializer.validated_data["salt_nonce"],
+                serializer.validated_data["owners"],
+                serializer.validated_data["threshold"],
+                serializer.validated_data["payment_token"],
             )
 
             safe_creation_service = SafeCreationServiceProvider()
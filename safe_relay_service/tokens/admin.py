@@ -49,7 +49,6 @@ class TokenAdmin(admin.ModelAdmin):
             return None
 
     def price_oracle_ticker_pairs(self, obj: Token):
-        return [
-            (price_oracle_ticker.price_oracle.name, price_oracle_ticker.ticker)
-            for price_oracle_ticker in obj.price_oracle_tickers.all()
-        ]
+        return list(
+            obj.price_oracle_tickers.values_list("price_oracle__name", "ticker")
+        )
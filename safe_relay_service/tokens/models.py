@@ -1,22 +1,54 @@
 import logging
 import math
-from typing import Optional
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from fractions import Fraction
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from urllib.parse import urljoin, urlparse
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
-from django.db.models import JSONField
+from django.db.models import JSONField, Prefetch
 
 from gnosis.eth.django.models import EthereumAddressField
 
 from .price_oracles import (
+    CannotConnectToPriceOracle,
     CannotGetTokenPriceFromApi,
-    ExchangeApiException,
     get_price_oracle,
 )
 
 logger = logging.getLogger(__name__)
 
+# When querying a ticker fails it's not queried again until the stored timestamp
+# (`time.monotonic()`), so a failing oracle doesn't slow down every estimation
+ORACLE_FAILURE_COOLDOWN = 60  # Seconds
+oracle_failures: Dict[Tuple[str, str], float] = {}
+# If a price oracle cannot be reached `ORACLE_FAILURE_THRESHOLD` consecutive times it's
+# probably down, so none of its tickers are queried until the cooldown is over. Tickers
+# missing from a successful response don't count, they are probably misconfigured
+ORACLE_FAILURE_THRESHOLD = 5
+price_oracle_consecutive_failures: Dict[str, int] = {}
+price_oracle_failures: Dict[str, float] = {}
+# Multiplier to convert a token price to ether value for every valid ERC20 `decimals`
+# (uint8). Ether has 18 decimals, but maybe the token has a different number
+DECIMALS_MULTIPLIERS = tuple(1e18 / 10**decimals for decimals in range(256))
+price_oracles_executor = ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix="price-oracles"
+)
+# Eth value of tokens is cached longer when the price is stable, using the relative
+# standard deviation of the last `ETH_VALUE_HISTORY_SIZE` calculated values
+ETH_VALUE_CACHE_MIN_TTL = 15  # Seconds
+ETH_VALUE_CACHE_MAX_TTL = 600  # Seconds
+ETH_VALUE_HISTORY_SIZE = 10
+ETH_VALUE_CACHE_KEY = "eth-value:%s"
+ETH_VALUE_HISTORY_CACHE_KEY = "eth-value-history:%s"
+
 
 class PriceOracle(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -25,6 +57,49 @@ class PriceOracle(models.Model):
     def __str__(self):
         return f"{self.name} configuration={self.configuration}"
 
+    @staticmethod
+    def register_failure(name: str) -> None:
+        """
+        Count a failed connection to the price oracle, stop querying it for
+        `ORACLE_FAILURE_COOLDOWN` if it reaches `ORACLE_FAILURE_THRESHOLD`
+
+        :param name: Name of the price oracle
+        """
+        consecutive_failures = price_oracle_consecutive_failures.get(name, 0) + 1
+        if consecutive_failures >= ORACLE_FAILURE_THRESHOLD:
+            price_oracle_failures[name] = time.monotonic() + ORACLE_FAILURE_COOLDOWN
+            consecutive_failures = 0
+            logger.warning(
+                "Price oracle %s could not be reached %d times in a row, not using it "
+                "for %d seconds",
+                name,
+                ORACLE_FAILURE_THRESHOLD,
+                ORACLE_FAILURE_COOLDOWN,
+            )
+        price_oracle_consecutive_failures[name] = consecutive_failures
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Configuration could have changed, don't use failures from the old one. Cached
+        # prices are keyed by configuration, but eth values of the tokens are not
+        Token.invalidate_eth_values(
+            self.tickers.filter(token__isnull=False).values_list("token_id", flat=True)
+        )
+        for key in list(oracle_failures.keys()):
+            if key[0] == self.name:
+                oracle_failures.pop(key, None)
+        price_oracle_consecutive_failures.pop(self.name, None)
+        price_oracle_failures.pop(self.name, None)
+
+    def delete(self, *args, **kwargs):
+        # Tickers are deleted on cascade, without calling `PriceOracleTicker.delete`
+        token_ids = list(
+            self.tickers.filter(token__isnull=False).values_list("token_id", flat=True)
+        )
+        result = super().delete(*args, **kwargs)
+        Token.invalidate_eth_values(token_ids)
+        return result
+
 
 class PriceOracleTicker(models.Model):
     price_oracle = models.ForeignKey(
@@ -47,22 +122,109 @@ class PriceOracleTicker(models.Model):
             self.inverse,
         )
 
-    def _price(self) -> Optional[float]:
-        try:
-            price = get_price_oracle(
-                self.price_oracle.name, self.price_oracle.configuration
-            ).get_price(self.ticker)
-            if price and self.inverse:  # Avoid 1 / 0
-                price = 1 / price
-        except ExchangeApiException:
-            logger.warning(
-                "Cannot get price for %s - %s",
-                self.price_oracle.name,
-                self.ticker,
-                exc_info=True,
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.token_id:
+            Token.invalidate_eth_values([self.token_id])
+
+    def delete(self, *args, **kwargs):
+        token_id = self.token_id
+        result = super().delete(*args, **kwargs)
+        if token_id:
+            Token.invalidate_eth_values([token_id])
+        return result
+
+    @staticmethod
+    def get_prices(
+        price_oracle_tickers: Sequence["PriceOracleTicker"],
+    ) -> List[Optional[float]]:
+        """
+        Get the prices of the tickers, querying every price oracle only once and
+        different price oracles concurrently. Tickers should have their price oracle
+        already fetched, so threads don't need to use the database
+
+        :param price_oracle_tickers:
+        :return: Price for every ticker, `None` if it cannot be retrieved
+        """
+        now = time.monotonic()
+        tickers_by_price_oracle: Dict[int, List[PriceOracleTicker]] = defaultdict(list)
+        for price_oracle_ticker in price_oracle_tickers:
+            price_oracle_name = price_oracle_ticker.price_oracle.name
+            key = (price_oracle_name, price_oracle_ticker.ticker)
+            # If it failed recently, don't query it again until cooldown is over
+            if (
+                oracle_failures.get(key, 0) <= now
+                and price_oracle_failures.get(price_oracle_name, 0) <= now
+            ):
+                tickers_by_price_oracle[price_oracle_ticker.price_oracle_id].append(
+                    price_oracle_ticker
+                )
+
+        def get_price_oracle_prices(
+            tickers: List[PriceOracleTicker],
+        ) -> Tuple[Dict[str, float], bool]:
+            """
+            :return: Prices of the tickers and whether the price oracle could be reached
+            """
+            price_oracle = tickers[0].price_oracle
+            try:
+                return (
+                    get_price_oracle(
+                        price_oracle.name, price_oracle.configuration
+                    ).get_prices(
+                        [price_oracle_ticker.ticker for price_oracle_ticker in tickers]
+                    ),
+                    True,
+                )
+            except CannotConnectToPriceOracle as e:
+                logger.warning("Cannot connect to price oracle %s", price_oracle.name)
+                return e.prices, False
+
+        grouped_tickers = list(tickers_by_price_oracle.values())
+        if len(grouped_tickers) > 1:
+            price_oracle_prices = price_oracles_executor.map(
+                get_price_oracle_prices, grouped_tickers
             )
-            price = None
-        return price
+        else:
+            price_oracle_prices = map(get_price_oracle_prices, grouped_tickers)
+
+        prices: Dict[int, float] = {}
+        for tickers, (oracle_prices, reachable) in zip(
+            grouped_tickers, price_oracle_prices
+        ):
+            price_oracle_name = tickers[0].price_oracle.name
+            if reachable:
+                price_oracle_consecutive_failures[price_oracle_name] = 0
+            else:
+                PriceOracle.register_failure(price_oracle_name)
+            for price_oracle_ticker in tickers:
+                price = oracle_prices.get(price_oracle_ticker.ticker)
+                if price is None:
+                    # If oracle could not be reached the ticker was probably not
+                    # queried, oracle failures are handled by `register_failure`
+                    if reachable:
+                        key = (price_oracle_name, price_oracle_ticker.ticker)
+                        oracle_failures[key] = (
+                            time.monotonic() + ORACLE_FAILURE_COOLDOWN
+                        )
+                        logger.warning(
+                            "Cannot get price for %s - %s, not trying again in %d "
+                            "seconds",
+                            price_oracle_name,
+                            price_oracle_ticker.ticker,
+                            ORACLE_FAILURE_COOLDOWN,
+                        )
+                    continue
+                if price and price_oracle_ticker.inverse:  # Avoid 1 / 0
+                    price = 1 / price
+                prices[id(price_oracle_ticker)] = price
+        return [
+            prices.get(id(price_oracle_ticker))
+            for price_oracle_ticker in price_oracle_tickers
+        ]
+
+    def _price(self) -> Optional[float]:
+        return self.get_prices([self])[0]
 
     price = property(_price)
 
@@ -71,6 +233,18 @@ class TokenQuerySet(models.QuerySet):
     def gas_tokens(self):
         return self.filter(gas=True)
 
+    def with_price_oracle_tickers(self):
+        """
+        Prefetch tickers and their price oracles, so getting the price of every token
+        doesn't query the database
+        """
+        return self.prefetch_related(
+            Prefetch(
+                "price_oracle_tickers",
+                queryset=PriceOracleTicker.objects.select_related("price_oracle"),
+            )
+        )
+
 
 class Token(models.Model):
     objects = TokenQuerySet.as_manager()
@@ -91,24 +265,170 @@ class Token(models.Model):
     def __str__(self):
         return "%s - %s" % (self.name, self.address)
 
+    def get_price_oracle_tickers(self) -> Iterable[PriceOracleTicker]:
+        """
+        :return: Price oracle tickers with their price oracle already fetched. Prefetched
+            ones are used if available (`TokenQuerySet.with_price_oracle_tickers`)
+        """
+        if "price_oracle_tickers" in getattr(self, "_prefetched_objects_cache", {}):
+            return self.price_oracle_tickers.all()
+        return self.price_oracle_tickers.select_related("price_oracle")
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.invalidate_eth_values([self.address])
+
+    @staticmethod
+    def invalidate_eth_values(token_addresses: Iterable[str]) -> None:
+        """
+        Remove the cached eth values and their history, so they are calculated again
+        using the current price oracle tickers of the tokens
+
+        :param token_addresses:
+        """
+        cache.delete_many(
+            [
+                cache_key % token_address
+                for token_address in token_addresses
+                for cache_key in (ETH_VALUE_CACHE_KEY, ETH_VALUE_HISTORY_CACHE_KEY)
+            ]
+        )
+
+    def _get_eth_value_cache_key(self) -> str:
+        return ETH_VALUE_CACHE_KEY % self.address
+
+    def _get_eth_value_history_cache_key(self) -> str:
+        return ETH_VALUE_HISTORY_CACHE_KEY % self.address
+
+    def _get_eth_value_cache_ttl(self, eth_value: float) -> int:
+        """
+        Store `eth_value` in the price history of the token and calculate for how long
+        it should be cached
+
+        :param eth_value:
+        :return: Seconds to cache `eth_value`, shorter when the price is volatile
+        """
+        history_key = self._get_eth_value_history_cache_key()
+        history: List[float] = cache.get(history_key, [])
+        history = history[-(ETH_VALUE_HISTORY_SIZE - 1) :] + [eth_value]
+        cache.set(
+            history_key, history, ETH_VALUE_CACHE_MAX_TTL * ETH_VALUE_HISTORY_SIZE
+        )
+        if len(history) < 2:
+            return ETH_VALUE_CACHE_MIN_TTL
+
+        relative_stddev = statistics.pstdev(history) / statistics.fmean(history)
+        ttl = 30 / max(relative_stddev, 0.01)
+        return int(min(max(ttl, ETH_VALUE_CACHE_MIN_TTL), ETH_VALUE_CACHE_MAX_TTL))
+
+    @cached_property
+    def _decimals_multiplier(self) -> float:
+        """
+        :return: Multiplier to convert a token price to ether value
+        """
+        if self.decimals < len(DECIMALS_MULTIPLIERS):
+            return DECIMALS_MULTIPLIERS[self.decimals]
+        return 1e18 / 10**self.decimals
+
     def get_eth_value(self) -> float:
-        multiplier = 1e18 / 10**self.decimals
+        """
+        :return: Value of the token in ether, using the fixed conversion if configured
+            or the average price of the price oracles otherwise. Prices from the oracles
+            are cached with an adaptive ttl (`_get_eth_value_cache_ttl`)
+        """
         if self.fixed_eth_conversion:  # `None` or `0` are ignored
-            # Ether has 18 decimals, but maybe the token has a different number
-            return round(multiplier * float(self.fixed_eth_conversion), 10)
+            return round(
+                self._decimals_multiplier * float(self.fixed_eth_conversion), 10
+            )
         else:
-            prices = [
-                price_oracle_ticker.price
-                for price_oracle_ticker in self.price_oracle_tickers.all()
-            ]
-            prices = [price for price in prices if price is not None and price > 0]
-            if prices:
-                # Get the average price of the price oracles
-                return multiplier * (sum(prices) / len(prices))
-            else:
-                raise CannotGetTokenPriceFromApi(
-                    "There is no working provider for token=%s" % self.address
+            eth_value = cache.get(self._get_eth_value_cache_key())
+            if eth_value is None:
+                eth_value = self._cache_eth_value(
+                    PriceOracleTicker.get_prices(list(self.get_price_oracle_tickers()))
                 )
+            return eth_value
+
+    def _cache_eth_value(self, prices: Iterable[Optional[float]]) -> float:
+        """
+        :param prices: Prices of the price oracle tickers of the token
+        :return: Eth value for the average of the valid `prices`, storing it on cache
+        :raises: CannotGetTokenPriceFromApi
+        """
+        prices = [price for price in prices if price is not None and price > 0]
+        if not prices:
+            raise CannotGetTokenPriceFromApi(
+                "There is no working provider for token=%s" % self.address
+            )
+
+        # Get the average price of the price oracles
+        eth_value = self._decimals_multiplier * (sum(prices) / len(prices))
+        cache.set(
+            self._get_eth_value_cache_key(),
+            eth_value,
+            self._get_eth_value_cache_ttl(eth_value),
+        )
+        return eth_value
+
+    @staticmethod
+    def prefetch_eth_values(tokens: Sequence["Token"]) -> None:
+        """
+        Calculate `eth_value` for all the `tokens` at once, so every price oracle is
+        queried only once for the tickers of all the tokens. Tokens should be retrieved
+        using `TokenQuerySet.with_price_oracle_tickers`. If price cannot be retrieved
+        for a token it's ignored, `eth_value` will raise when accessed
+
+        :param tokens:
+        """
+        tokens_by_cache_key: Dict[str, Token] = {}
+        for token in tokens:
+            if "eth_value" in token.__dict__:
+                continue
+            if token.fixed_eth_conversion:
+                token.eth_value = token.get_eth_value()
+            else:
+                tokens_by_cache_key[token._get_eth_value_cache_key()] = token
+
+        # Get every cached eth value in one request
+        cached_eth_values = cache.get_many(tokens_by_cache_key)
+        tickers_by_token: Dict[Token, List[PriceOracleTicker]] = {}
+        for cache_key, token in tokens_by_cache_key.items():
+            eth_value = cached_eth_values.get(cache_key)
+            if eth_value is None:
+                tickers_by_token[token] = list(token.get_price_oracle_tickers())
+            else:
+                token.eth_value = eth_value
+
+        prices = iter(
+            PriceOracleTicker.get_prices(
+                [
+                    price_oracle_ticker
+                    for price_oracle_tickers in tickers_by_token.values()
+                    for price_oracle_ticker in price_oracle_tickers
+                ]
+            )
+        )
+        for token, price_oracle_tickers in tickers_by_token.items():
+            token_prices = [next(prices) for _ in price_oracle_tickers]
+            try:
+                token.eth_value = token._cache_eth_value(token_prices)
+            except CannotGetTokenPriceFromApi:
+                logger.warning("Cannot get price for token=%s", token.address)
+
+    @cached_property
+    def eth_value(self) -> float:
+        """
+        :return: `get_eth_value()`, only calculated once for the instance
+        """
+        return self.get_eth_value()
+
+    @cached_property
+    def eth_value_fraction(self) -> Fraction:
+        """
+        :return: `eth_value` as an exact fraction, so conversions are done with integer
+            arithmetic and are not affected by float rounding, even for tiny values of
+            tokens with more than 18 decimals
+        """
+        return Fraction(Decimal(str(self.eth_value)))
 
     def calculate_payment(self, eth_payment: int) -> int:
         """
@@ -116,7 +436,7 @@ class Token(models.Model):
         :param eth_payment: Ether payment (in wei)
         :return: Token payment equivalent for the ether value
         """
-        return math.ceil(eth_payment / self.get_eth_value())
+        return math.ceil(eth_payment / self.eth_value_fraction)
 
     def calculate_gas_price(self, gas_price: int, price_margin: float = 1.0) -> int:
         """
@@ -126,7 +446,49 @@ class Token(models.Model):
         not be rejected in a few minutes
         :return:
         """
-        return math.ceil(gas_price / self.get_eth_value() * price_margin)
+        return self._calculate_gas_price(
+            gas_price * self._get_price_margin_fraction(price_margin)
+        )
+
+    def _calculate_gas_price(self, gas_price_with_margin: Fraction) -> int:
+        return math.ceil(gas_price_with_margin / self.eth_value_fraction)
+
+    @staticmethod
+    def _get_price_margin_fraction(price_margin: float) -> Fraction:
+        return Fraction(Decimal(str(price_margin)))
+
+    @staticmethod
+    def calculate_gas_prices(
+        tokens: Sequence["Token"], gas_price: int, price_margin: float = 1.0
+    ) -> List[Optional[int]]:
+        """
+        Converts ether gas price to the gas price of every token, getting the eth
+        values of all the tokens at once (`prefetch_eth_values`)
+
+        :param tokens:
+        :param gas_price: Regular ether gas price
+        :param price_margin: Threshold to estimate a little higher, so tx will
+        not be rejected in a few minutes
+        :return: Gas price for every token, `None` if its price cannot be retrieved
+        """
+        Token.prefetch_eth_values(tokens)
+        gas_price_with_margin = gas_price * Token._get_price_margin_fraction(
+            price_margin
+        )
+        gas_prices: List[Optional[int]] = []
+        for token in tokens:
+            try:
+                gas_prices.append(token._calculate_gas_price(gas_price_with_margin))
+            except CannotGetTokenPriceFromApi:
+                gas_prices.append(None)
+        return gas_prices
+
+    @cached_property
+    def full_logo_uri(self) -> str:
+        """
+        :return: `get_full_logo_uri()`, only calculated once for the instance
+        """
+        return self.get_full_logo_uri()
 
     def get_full_logo_uri(self):
         if urlparse(self.logo_uri).netloc:
@@ -1,21 +1,37 @@
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple, Type
 
+from django.core.cache import cache
+
+import orjson
 import requests
-from cachetools import TTLCache, cached
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
 
 from gnosis.eth import EthereumClientProvider
-from gnosis.eth.oracles import (
-    KyberOracle,
-    OracleException,
-    UniswapOracle,
-    UniswapV2Oracle,
-    UniswapV3Oracle,
-)
+from gnosis.eth.oracles import KyberOracle, OracleException
+from gnosis.eth.oracles import PriceOracle as EthereumPriceOracle
+from gnosis.eth.oracles import UniswapOracle, UniswapV2Oracle, UniswapV3Oracle
 
 logger = logging.getLogger(__name__)
 
+# Shared between oracles, so connections to the exchanges are kept alive and reused
+http_session = requests.Session()
+http_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=1, backoff_factor=0.1),
+    ),
+)
+HTTP_TIMEOUT = (1.5, 3.0)  # Seconds for (connect, read)
+
 
 class ExchangeApiException(Exception):
     pass
@@ -25,26 +41,204 @@ class CannotGetTokenPriceFromApi(ExchangeApiException):
     pass
 
 
+class CannotConnectToPriceOracle(CannotGetTokenPriceFromApi):
+    """
+    Price oracle cannot be reached or it's failing, whatever the ticker queried.
+    `prices` contains the prices retrieved before the failure (`get_prices`)
+    """
+
+    def __init__(self, *args, prices: Optional[Dict[str, float]] = None):
+        super().__init__(*args)
+        self.prices = prices or {}
+
+
 class InvalidTicker(ExchangeApiException):
     pass
 
 
 class PriceOracle(ABC):
+    def get_cache_key(self, ticker: str) -> str:
+        """
+        :param ticker:
+        :return: Cache key for the price of the `ticker`, different for every
+            oracle configuration
+        """
+        configuration = ":".join(str(value) for _, value in sorted(vars(self).items()))
+        return f"price-oracle:{self.__class__.__name__}:{configuration}:{ticker}"
+
     @abstractmethod
     def get_price(self, ticker) -> float:
         pass
 
+    def get_prices(self, tickers: Sequence[str]) -> Dict[str, float]:
+        """
+        Oracles supporting querying multiple tickers at once should override this method
+
+        :param tickers:
+        :return: Dictionary with ticker and its price. Tickers whose price cannot be
+            retrieved are not included
+        :raises: CannotConnectToPriceOracle, remaining tickers are not queried
+        """
+        prices = {}
+        for ticker in tickers:
+            try:
+                prices[ticker] = self.get_price(ticker)
+            except CannotConnectToPriceOracle as e:
+                e.prices = {**prices, **e.prices}
+                raise
+            except ExchangeApiException:
+                logger.warning(
+                    "Cannot get price for ticker=%s using %s",
+                    ticker,
+                    self.__class__.__name__,
+                    exc_info=True,
+                )
+        return prices
+
+
+# Prices are refreshed when they are older than `ORACLE_CACHE_TTL`. Until they are
+# `ORACLE_CACHE_GRACE` seconds older than that they are still served while they are
+# refreshed in the background (stale-while-revalidate)
+ORACLE_CACHE_TTL = 60  # Seconds
+ORACLE_CACHE_GRACE = 240  # Seconds
+price_refresh_executor = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="price-refresh"
+)
+
+
+def cache_prices(
+    prices: Dict[str, float],
+    ttl: int = ORACLE_CACHE_TTL,
+    grace: int = ORACLE_CACHE_GRACE,
+):
+    """
+    :param prices: Dictionary with cache key and price
+    :param ttl:
+    :param grace:
+    """
+    fetched_at = time.time()
+    cache.set_many(
+        {key: (price, fetched_at) for key, price in prices.items()}, ttl + grace
+    )
+
+
+def oracle_cache(
+    ttl: int = ORACLE_CACHE_TTL, grace: int = ORACLE_CACHE_GRACE
+) -> Callable:
+    """
+    Cache `PriceOracle.get_price` using Django cache, so prices are shared between
+    every process of the service. Stale prices are returned while they are refreshed
+    in the background, only one process refreshes every price
+
+    :param ttl: Seconds to consider the price fresh
+    :param grace: Seconds to return the price while it's refreshed after `ttl`
+    """
+
+    def decorator(get_price: Callable[[PriceOracle, str], float]):
+        def refresh_price(self: PriceOracle, ticker: str, key: str) -> float:
+            price = get_price(self, ticker)
+            cache_prices({key: price}, ttl=ttl, grace=grace)
+            return price
+
+        def refresh_price_in_background(self: PriceOracle, ticker: str, key: str):
+            try:
+                refresh_price(self, ticker, key)
+            except ExchangeApiException:
+                logger.warning(
+                    "Cannot refresh price for ticker=%s using %s",
+                    ticker,
+                    self.__class__.__name__,
+                    exc_info=True,
+                )
+            finally:
+                cache.delete(key + ":refreshing")
+
+        def get_cached_price(
+            self: PriceOracle,
+            ticker: str,
+            key: str,
+            cached_price: Tuple[float, float],
+        ) -> float:
+            """
+            :return: Cached price, refreshing it in the background if it's stale. It
+                never queries the oracle, so it never raises
+            """
+            price, fetched_at = cached_price
+            # `cache.add` is atomic, so only one process refreshes the price. Lock
+            # expires in case the refresh never finishes
+            if time.time() - fetched_at >= ttl and cache.add(
+                key + ":refreshing", True, ttl
+            ):
+                price_refresh_executor.submit(
+                    refresh_price_in_background, self, ticker, key
+                )
+            return price
+
+        @wraps(get_price)
+        def wrapper(self: PriceOracle, ticker: str) -> float:
+            key = self.get_cache_key(ticker)
+            cached_price = cache.get(key)
+            if cached_price is None:
+                return refresh_price(self, ticker, key)
+            return get_cached_price(self, ticker, key, cached_price)
+
+        # For oracles reading the cached prices of many tickers at once (`get_prices`)
+        wrapper.get_cached_price = get_cached_price
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=32)
+def get_ethereum_oracle(
+    oracle_class: Type[EthereumPriceOracle], address: str
+) -> EthereumPriceOracle:
+    """
+    On chain oracles are reused, so their contracts are not built (and some of their
+    addresses are not retrieved from the chain) every time a price is queried
+
+    :param oracle_class:
+    :param address: Address of the oracle contract
+    :return: Instance of `oracle_class`
+    """
+    return oracle_class(EthereumClientProvider(), address)
+
+
+def get_response(url: str) -> requests.Response:
+    """
+    :param url:
+    :return: Response from the exchange API, it could be an error for the ticker
+    :raises: CannotConnectToPriceOracle if API cannot be reached or has a server error
+    """
+    try:
+        response = http_session.get(url, timeout=HTTP_TIMEOUT)
+    except IOError as e:
+        logger.warning("Cannot connect to url=%s", url)
+        raise CannotConnectToPriceOracle from e
+    if response.status_code >= 500:
+        logger.warning(
+            "Cannot get price from url=%s, status-code=%d", url, response.status_code
+        )
+        raise CannotConnectToPriceOracle(response.status_code)
+    return response
+
 
 class Huobi(PriceOracle):
     """
     Get valid symbols from https://api.huobi.pro/v1/common/symbols
     """
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    price_url = "https://api.huobi.pro/market/detail/merged?symbol=%s"
+
+    @oracle_cache()
     def get_price(self, ticker) -> float:
-        url = "https://api.huobi.pro/market/detail/merged?symbol=%s" % ticker
-        response = requests.get(url)
-        api_json = response.json()
+        url = self.price_url % ticker
+        response = get_response(url)
+        try:
+            api_json = orjson.loads(response.content)
+        except ValueError as e:
+            logger.warning("Cannot get price from url=%s", url)
+            raise CannotGetTokenPriceFromApi from e
         error = api_json.get("err-msg")
         if not response.ok or error:
             logger.warning("Cannot get price from url=%s", url)
@@ -53,33 +247,116 @@ class Huobi(PriceOracle):
 
 
 class Kraken(PriceOracle):
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
-    def get_price(self, ticker) -> float:
-        url = "https://api.kraken.com/0/public/Ticker?pair=" + ticker
-        response = requests.get(url)
-        api_json = response.json()
+    base_url = "https://api.kraken.com/0/public/"
+    ticker_url = base_url + "Ticker?pair=%s"
+    asset_pairs_url = base_url + "AssetPairs?pair=%s"
+
+    def _get_result(self, url: str) -> Dict[str, Any]:
+        response = get_response(url)
+        try:
+            api_json = orjson.loads(response.content)
+        except ValueError as e:
+            logger.warning("Cannot get price from url=%s", url)
+            raise CannotGetTokenPriceFromApi from e
         error = api_json.get("error")
         if not response.ok or error:
             logger.warning("Cannot get price from url=%s", url)
             raise CannotGetTokenPriceFromApi(str(api_json["error"]))
+        return api_json["result"]
 
-        result = api_json["result"]
+    @oracle_cache()
+    def get_price(self, ticker) -> float:
+        result = self._get_result(self.ticker_url % ticker)
         for new_ticker in result:
             return float(result[new_ticker]["c"][0])
 
+    def _get_pair_names(self, pairs: str) -> Dict[str, str]:
+        """
+        Kraken returns results using its own pair names (`ETHEUR` is returned as
+        `XETHZEUR`), so they need to be mapped to the requested ones
+
+        :param pairs: Comma separated pairs
+        :return: Dictionary with Kraken pair name and its alternative name
+        """
+        cache_key = f"kraken-pair-names:{pairs}"
+        pair_names = cache.get(cache_key)
+        if pair_names is None:
+            pair_names = {
+                name: pair_info["altname"]
+                for name, pair_info in self._get_result(
+                    self.asset_pairs_url % pairs
+                ).items()
+            }
+            cache.set(cache_key, pair_names, 60 * 60 * 24)
+        return pair_names
+
+    def get_prices(self, tickers: Sequence[str]) -> Dict[str, float]:
+        """
+        Query every ticker not cached in only one request
+        """
+        cache_keys = {self.get_cache_key(ticker): ticker for ticker in tickers}
+        prices = {}
+        for cache_key, cached_price in cache.get_many(cache_keys).items():
+            ticker = cache_keys[cache_key]
+            # Stale prices are returned and refreshed in the background
+            prices[ticker] = self.get_price.get_cached_price(
+                self, ticker, cache_key, cached_price
+            )
+        not_cached_tickers = [ticker for ticker in tickers if ticker not in prices]
+        try:
+            if len(not_cached_tickers) > 1:
+                prices.update(self._get_not_cached_prices(not_cached_tickers))
+            prices.update(
+                super().get_prices(
+                    [ticker for ticker in not_cached_tickers if ticker not in prices]
+                )
+            )
+        except CannotConnectToPriceOracle as e:
+            e.prices = {**prices, **e.prices}
+            raise
+        return prices
+
+    def _get_not_cached_prices(self, tickers: Sequence[str]) -> Dict[str, float]:
+        """
+        :param tickers:
+        :return: Prices for the `tickers` using only one request, storing them on cache.
+            Empty if Kraken rejects the request
+        :raises: CannotConnectToPriceOracle
+        """
+        requested_tickers = set(tickers)
+        pairs = ",".join(sorted(requested_tickers))
+        try:
+            pair_names = self._get_pair_names(pairs)
+            result = self._get_result(self.ticker_url % pairs)
+        except CannotConnectToPriceOracle:
+            raise
+        except CannotGetTokenPriceFromApi:
+            # Kraken fails the whole request if one of the pairs is not valid,
+            # tickers will be queried one by one
+            return {}
+
+        prices = {}
+        for name, ticker_result in result.items():
+            ticker = name if name in requested_tickers else pair_names.get(name)
+            if ticker:
+                prices[ticker] = float(ticker_result["c"][0])
+        cache_prices(
+            {self.get_cache_key(ticker): price for ticker, price in prices.items()}
+        )
+        return prices
+
 
 class Uniswap(PriceOracle):
     def __init__(self, uniswap_exchange_address: str, **kwargs):
         self.uniswap_exchange_address = uniswap_exchange_address
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @oracle_cache()
     def get_price(self, ticker: str) -> float:
         """
         :param ticker: Address of the token
         :return: price
         """
-        ethereum_client = EthereumClientProvider()
-        uniswap = UniswapOracle(ethereum_client, self.uniswap_exchange_address)
+        uniswap = get_ethereum_oracle(UniswapOracle, self.uniswap_exchange_address)
         try:
             return uniswap.get_price(ticker)
         except OracleException as e:
@@ -90,14 +367,13 @@ class UniswapV2(PriceOracle):
     def __init__(self, router_address: str, **kwargs):
         self.router_address = router_address
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @oracle_cache()
     def get_price(self, ticker: str) -> float:
         """
         :param ticker: Address of the token
         :return: price
         """
-        ethereum_client = EthereumClientProvider()
-        uniswap = UniswapV2Oracle(ethereum_client, self.router_address)
+        uniswap = get_ethereum_oracle(UniswapV2Oracle, self.router_address)
         try:
             return uniswap.get_price(ticker)
         except OracleException as e:
@@ -108,14 +384,13 @@ class UniswapV3(PriceOracle):
     def __init__(self, router_address: str, **kwargs):
         self.router_address = router_address
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @oracle_cache()
     def get_price(self, ticker: str) -> float:
         """
         :param ticker: Address of the token
         :return: price
         """
-        ethereum_client = EthereumClientProvider()
-        uniswap = UniswapV3Oracle(ethereum_client, self.router_address)
+        uniswap = get_ethereum_oracle(UniswapV3Oracle, self.router_address)
         try:
             return uniswap.get_price(ticker)
         except OracleException as e:
@@ -126,22 +401,21 @@ class Kyber(PriceOracle):
     def __init__(self, kyber_network_proxy_address: str, **kwargs):
         self.kyber_network_proxy_address = kyber_network_proxy_address
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @oracle_cache()
     def get_price(self, ticker: str) -> float:
         """
         :param ticker: Address of the token
         :return: price
         """
-        ethereum_client = EthereumClientProvider()
-        kyber = KyberOracle(ethereum_client, self.kyber_network_proxy_address)
+        kyber = get_ethereum_oracle(KyberOracle, self.kyber_network_proxy_address)
         try:
             return kyber.get_price(ticker)
         except OracleException as e:
             raise CannotGetTokenPriceFromApi from e
 
 
-def get_price_oracle(name: str, configuration: Dict[Any, Any] = {}) -> PriceOracle:
-    oracles = {
+PRICE_ORACLES: Mapping[str, Type[PriceOracle]] = MappingProxyType(
+    {
         "huobi": Huobi,
         "kraken": Kraken,
         "kyber": Kyber,
@@ -149,9 +423,29 @@ def get_price_oracle(name: str, configuration: Dict[Any, Any] = {}) -> PriceOrac
         "uniswapv3": UniswapV3,
         "uniswapv2": UniswapV2,
     }
+)
+# Oracle instances are reused, so their caches are not lost between calls. They are
+# stored using the name as provided too, so it's only lowercased the first time
+_price_oracle_instances: Dict[Tuple[str, Tuple[Tuple[Any, Any], ...]], PriceOracle] = {}
+
 
-    oracle = oracles.get(name.lower())
-    if oracle:
-        return oracle(**configuration)
-    else:
-        raise NotImplementedError("Oracle '%s' not found" % name)
+def get_price_oracle(name: str, configuration: Dict[Any, Any] = {}) -> PriceOracle:
+    """
+    :param name: Name of the oracle, case insensitive
+    :param configuration: Parameters for the oracle constructor
+    :return: Instance of the oracle, the same one is returned for the same
+        `name` and `configuration`
+    :raises: NotImplementedError if oracle is not supported
+    """
+    configuration_items = tuple(sorted(configuration.items()))
+    price_oracle = _price_oracle_instances.get((name, configuration_items))
+    if not price_oracle:
+        oracle_name = name.lower()
+        oracle = PRICE_ORACLES.get(oracle_name)
+        if not oracle:
+            raise NotImplementedError("Oracle '%s' not found" % name)
+        price_oracle = _price_oracle_instances.setdefault(
+            (oracle_name, configuration_items), oracle(**configuration)
+        )
+        _price_oracle_instances[(name, configuration_items)] = price_oracle
+    return price_oracle
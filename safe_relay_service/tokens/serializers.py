@@ -1,18 +1,31 @@
+from django.db.models import QuerySet
+
 from rest_framework import serializers
 
 from .models import Token
 
 
 class TokenSerializer(serializers.ModelSerializer):
-    logo_uri = serializers.SerializerMethodField()
-    default = serializers.SerializerMethodField()
+    logo_uri = serializers.CharField(source="full_logo_uri", read_only=True)
+    default = serializers.BooleanField(source="gas", read_only=True)
 
     class Meta:
         model = Token
         exclude = ["fixed_eth_conversion", "price_oracles", "relevance"]
 
-    def get_logo_uri(self, obj: Token):
-        return obj.get_full_logo_uri()
-
-    def get_default(self, obj: Token):
-        return obj.gas
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet) -> QuerySet:
+        """
+        :param queryset: Token queryset
+        :return: Queryset only fetching the fields used by the serializer
+        """
+        return queryset.only(
+            "address",
+            "name",
+            "symbol",
+            "description",
+            "decimals",
+            "logo_uri",
+            "website_uri",
+            "gas",
+        )
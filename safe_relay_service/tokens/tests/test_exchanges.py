@@ -1,25 +1,59 @@
+import time
 from typing import List
+from unittest import mock
 
-from django.test import TestCase
+from django.test import SimpleTestCase, override_settings
+
+import pytest
+import requests
+import responses
+from responses import matchers
 
 from ..price_oracles import (
+    CannotConnectToPriceOracle,
+    CannotGetTokenPriceFromApi,
     ExchangeApiException,
     Huobi,
     Kraken,
     PriceOracle,
+    cache_prices,
     get_price_oracle,
+    http_session,
+    oracle_cache,
+    price_refresh_executor,
 )
+from .utils import LOCAL_MEMORY_CACHES
 
+HUOBI_URL = "https://api.huobi.pro/market/detail/merged"
+KRAKEN_URL = "https://api.kraken.com/0/public/Ticker"
+# Url, query params and json response of the mocked exchange APIs
+EXCHANGE_RESPONSES = [
+    (HUOBI_URL, {"symbol": "ethusdt"}, {"status": "ok", "tick": {"close": 1843.27}}),
+    (HUOBI_URL, {"symbol": "btcusdt"}, {"status": "ok", "tick": {"close": 27310.5}}),
+    (
+        HUOBI_URL,
+        {"symbol": "BADTICKER"},
+        {
+            "status": "error",
+            "err-code": "invalid-parameter",
+            "err-msg": "invalid symbol",
+        },
+    ),
+    (
+        KRAKEN_URL,
+        {"pair": "ETHEUR"},
+        {"error": [], "result": {"XETHZEUR": {"c": ["1694.12", "0.1"]}}},
+    ),
+    (
+        KRAKEN_URL,
+        {"pair": "GNOEUR"},
+        {"error": [], "result": {"GNOEUR": {"c": ["101.5", "0.1"]}}},
+    ),
+    (KRAKEN_URL, {"pair": "BADTICKER"}, {"error": ["EQuery:Unknown asset pair"]}),
+]
 
-class TestExchanges(TestCase):
-    def test_get_price_oracle(self):
-        self.assertIsInstance(get_price_oracle("KRAKEN"), Kraken)
-        self.assertIsInstance(get_price_oracle("kraKen"), Kraken)
-        self.assertIsInstance(get_price_oracle("Huobi"), Huobi)
-        self.assertIsInstance(get_price_oracle("huobI"), Huobi)
-        with self.assertRaises(NotImplementedError):
-            get_price_oracle("Another")
 
+class ExchangeTestMixin:
     def exchange_helper(
         self, exchange: PriceOracle, tickers: List[str], bad_tickers: List[str]
     ):
@@ -40,3 +74,181 @@ class TestExchanges(TestCase):
     def test_kraken(self):
         exchange = Kraken()
         self.exchange_helper(exchange, ["ETHEUR", "GNOEUR"], ["BADTICKER"])
+
+
+class TestExchanges(ExchangeTestMixin, SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Exchange APIs are mocked once for all the tests
+        cls.mocked_responses = responses.RequestsMock(
+            assert_all_requests_are_fired=False
+        )
+        for url, params, json in EXCHANGE_RESPONSES:
+            cls.mocked_responses.add(
+                responses.GET,
+                url,
+                match=[matchers.query_param_matcher(params)],
+                json=json,
+            )
+        cls.mocked_responses.start()
+        cls.addClassCleanup(cls.mocked_responses.stop)
+
+    def test_get_price_oracle(self):
+        self.assertIsInstance(get_price_oracle("KRAKEN"), Kraken)
+        self.assertIsInstance(get_price_oracle("kraKen"), Kraken)
+        self.assertIsInstance(get_price_oracle("Huobi"), Huobi)
+        self.assertIsInstance(get_price_oracle("huobI"), Huobi)
+        self.assertIs(get_price_oracle("Huobi"), get_price_oracle("huobi"))
+        self.assertIsNot(
+            get_price_oracle("uniswapv2", {"router_address": "0x01"}),
+            get_price_oracle("uniswapv2", {"router_address": "0x02"}),
+        )
+        with self.assertRaises(NotImplementedError):
+            get_price_oracle("Another")
+
+    @override_settings(CACHES=LOCAL_MEMORY_CACHES)
+    def test_oracle_cache(self):
+        calls = []
+
+        class TestOracle(PriceOracle):
+            def __init__(self, address: str):
+                self.address = address
+
+            @oracle_cache(ttl=60)
+            def get_price(self, ticker) -> float:
+                calls.append((self.address, ticker))
+                return 2.0
+
+        oracle = TestOracle("0x01")
+        self.assertEqual(oracle.get_price("ETHEUR"), 2.0)
+        self.assertEqual(oracle.get_price("ETHEUR"), 2.0)
+        # Instances with the same configuration share the cache
+        self.assertEqual(TestOracle("0x01").get_price("ETHEUR"), 2.0)
+        self.assertEqual(calls, [("0x01", "ETHEUR")])
+
+        self.assertEqual(oracle.get_price("GNOEUR"), 2.0)
+        self.assertEqual(TestOracle("0x02").get_price("ETHEUR"), 2.0)
+        self.assertEqual(
+            calls, [("0x01", "ETHEUR"), ("0x01", "GNOEUR"), ("0x02", "ETHEUR")]
+        )
+
+    @override_settings(CACHES=LOCAL_MEMORY_CACHES)
+    @mock.patch.object(
+        price_refresh_executor,
+        "submit",
+        side_effect=lambda fn, *args: fn(*args),  # Refresh synchronously
+    )
+    @mock.patch.object(time, "time", return_value=1000.0)
+    def test_oracle_cache_stale_while_revalidate(self, time_mock, submit_mock):
+        prices = iter([2.0, 3.0, 4.0])
+
+        class TestOracle(PriceOracle):
+            @oracle_cache(ttl=60, grace=240)
+            def get_price(self, ticker) -> float:
+                return next(prices)
+
+        oracle = TestOracle()
+        self.assertEqual(oracle.get_price("ETHEUR"), 2.0)
+        time_mock.return_value += 59
+        self.assertEqual(oracle.get_price("ETHEUR"), 2.0)
+        submit_mock.assert_not_called()
+
+        # Stale price is returned, and refreshed in the background
+        time_mock.return_value += 1
+        self.assertEqual(oracle.get_price("ETHEUR"), 2.0)
+        submit_mock.assert_called_once()
+        self.assertEqual(oracle.get_price("ETHEUR"), 3.0)
+
+        # After the grace period price is not returned anymore
+        time_mock.return_value += 300
+        self.assertEqual(oracle.get_price("ETHEUR"), 4.0)
+        submit_mock.assert_called_once()
+
+    def test_get_response(self):
+        with mock.patch.object(
+            http_session, "get", side_effect=requests.ConnectionError
+        ):
+            with self.assertRaises(CannotConnectToPriceOracle):
+                Huobi().get_price("ethusdt")
+
+        with mock.patch.object(
+            http_session, "get", return_value=mock.MagicMock(status_code=503)
+        ):
+            with self.assertRaises(CannotConnectToPriceOracle):
+                Kraken().get_price("ETHEUR")
+
+        # Exchange is working, ticker is not valid
+        with self.assertRaises(CannotGetTokenPriceFromApi) as context:
+            Huobi().get_price("BADTICKER")
+        self.assertNotIsInstance(context.exception, CannotConnectToPriceOracle)
+
+    def test_kraken_get_prices(self):
+        kraken = Kraken()
+        with mock.patch.object(Kraken, "_get_result", autospec=True) as get_result_mock:
+            get_result_mock.side_effect = [
+                {"XETHZEUR": {"altname": "ETHEUR"}, "GNOEUR": {"altname": "GNOEUR"}},
+                {"XETHZEUR": {"c": ["1500.5", "1"]}, "GNOEUR": {"c": ["100.2", "1"]}},
+            ]
+            self.assertEqual(
+                kraken.get_prices(["ETHEUR", "GNOEUR"]),
+                {"ETHEUR": 1500.5, "GNOEUR": 100.2},
+            )
+            self.assertEqual(get_result_mock.call_count, 2)
+            self.assertEqual(
+                get_result_mock.call_args.args[1],
+                "https://api.kraken.com/0/public/Ticker?pair=ETHEUR,GNOEUR",
+            )
+
+            # One of the pairs is not valid, every ticker is queried on its own
+            get_result_mock.reset_mock()
+            get_result_mock.side_effect = [
+                CannotGetTokenPriceFromApi("EQuery:Unknown asset pair"),
+                {"XETHZEUR": {"c": ["1500.5", "1"]}},
+                CannotGetTokenPriceFromApi("EQuery:Unknown asset pair"),
+            ]
+            self.assertEqual(
+                kraken.get_prices(["ETHEUR", "BADTICKER"]), {"ETHEUR": 1500.5}
+            )
+            self.assertEqual(get_result_mock.call_count, 3)
+
+            # Kraken cannot be reached, tickers are not queried one by one
+            get_result_mock.reset_mock()
+            get_result_mock.side_effect = CannotConnectToPriceOracle
+            with self.assertRaises(CannotConnectToPriceOracle):
+                kraken.get_prices(["ETHEUR", "BADTICKER"])
+            get_result_mock.assert_called_once()
+
+    @override_settings(CACHES=LOCAL_MEMORY_CACHES)
+    @mock.patch.object(price_refresh_executor, "submit")
+    @mock.patch.object(time, "time", return_value=1000.0)
+    def test_kraken_get_prices_stale(self, time_mock, submit_mock):
+        kraken = Kraken()
+        cache_prices({kraken.get_cache_key("ETHEUR"): 1500.5})
+        time_mock.return_value += 100
+        with mock.patch.object(
+            Kraken,
+            "_get_result",
+            side_effect=CannotGetTokenPriceFromApi,
+            autospec=True,
+        ) as get_result_mock:
+            # Stale price is returned without querying Kraken, even if it's down
+            self.assertEqual(
+                kraken.get_prices(["ETHEUR", "GNOEUR"]), {"ETHEUR": 1500.5}
+            )
+            submit_mock.assert_called_once()
+            get_result_mock.assert_called_once()  # Only for `GNOEUR`
+
+            # Cached prices are kept if Kraken cannot be reached
+            get_result_mock.side_effect = CannotConnectToPriceOracle
+            with self.assertRaises(CannotConnectToPriceOracle) as context:
+                kraken.get_prices(["ETHEUR", "GNOEUR"])
+            self.assertEqual(context.exception.prices, {"ETHEUR": 1500.5})
+
+
+@pytest.mark.integration
+class TestExchangesIntegration(ExchangeTestMixin, SimpleTestCase):
+    """
+    Same checks as `TestExchanges` but against the real exchange APIs.
+    Run with `pytest --run-integration`
+    """
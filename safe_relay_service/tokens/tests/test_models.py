@@ -2,53 +2,162 @@ from unittest import mock
 from urllib.parse import urljoin
 
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
 
+import factory
 from web3 import Web3
 
-from ..models import PriceOracle
-from ..price_oracles import CannotGetTokenPriceFromApi, Kraken
+from ..models import (
+    ETH_VALUE_CACHE_MAX_TTL,
+    ETH_VALUE_CACHE_MIN_TTL,
+    ORACLE_FAILURE_THRESHOLD,
+    PriceOracle,
+    PriceOracleTicker,
+    Token,
+    oracle_failures,
+    price_oracle_consecutive_failures,
+    price_oracle_failures,
+)
+from ..price_oracles import (
+    CannotConnectToPriceOracle,
+    CannotGetTokenPriceFromApi,
+    Kraken,
+    http_session,
+)
 from .factories import PriceOracleTickerFactory, TokenFactory
+from .utils import LOCAL_MEMORY_CACHES
+
+ONE_ETHER = Web3.to_wei(1, "ether")
+HALF_ETHER = Web3.to_wei(0.5, "ether")
+TENTH_ETHER = Web3.to_wei(0.1, "ether")
+TEN_ETHER = Web3.to_wei(10, "ether")
 
 
 class TestModels(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kraken_oracle = PriceOracle.objects.get(name="Kraken")
+
+    def setUp(self) -> None:
+        oracle_failures.clear()
+        price_oracle_consecutive_failures.clear()
+        price_oracle_failures.clear()
+        # Exchange APIs must never be reached, e.g. by `Kraken.get_prices` batching
+        # requests for the tickers not mocked by the tests. Requests are rejected
+        # (not a connection error), so tickers are queried one by one using `get_price`
+        http_session_patcher = mock.patch.object(
+            http_session,
+            "get",
+            return_value=mock.MagicMock(
+                status_code=400,
+                ok=False,
+                content=b'{"error": ["EGeneral:Invalid arguments"]}',
+            ),
+        )
+        self.http_session_get_mock = http_session_patcher.start()
+        self.addCleanup(http_session_patcher.stop)
+
     def test_price_oracles(self):
         self.assertEqual(PriceOracle.objects.count(), 4)
 
-    def test_token_calculate_payment(self):
-        token = TokenFactory(fixed_eth_conversion=0.1)
+    @override_settings(CACHES=LOCAL_MEMORY_CACHES)
+    def test_token_prefetch_eth_values_cached(self):
+        cache.clear()
+        cached_token = TokenFactory(fixed_eth_conversion=None)
+        cache.set(cached_token._get_eth_value_cache_key(), 5.0)
+        token = TokenFactory(fixed_eth_conversion=None)
+        with mock.patch.object(
+            PriceOracleTicker, "get_prices", return_value=[]
+        ) as get_prices_mock, mock.patch.object(
+            cache, "get_many", wraps=cache.get_many
+        ) as get_many_mock:
+            Token.prefetch_eth_values([cached_token, token])
+            get_many_mock.assert_called_once()
+            get_prices_mock.assert_called_once_with([])  # No tickers configured
+        self.assertEqual(cached_token.eth_value, 5.0)
+        self.assertNotIn("eth_value", token.__dict__)
+
+    def test_token_calculate_gas_prices(self):
+        tokens = TokenFactory.create_batch_fast(
+            3,
+            # Token without fixed conversion has no price oracles configured
+            fixed_eth_conversion=factory.Iterator([0.1, None, 3.0]),
+        )
         self.assertEqual(
-            token.calculate_payment(Web3.to_wei(1, "ether")), Web3.to_wei(10, "ether")
+            Token.calculate_gas_prices(tokens, Web3.to_wei(1, "gwei")),
+            [Web3.to_wei(10, "gwei"), None, 333333334],
         )
-
-        token = TokenFactory(fixed_eth_conversion=1.0)
         self.assertEqual(
-            token.calculate_payment(Web3.to_wei(1, "ether")), Web3.to_wei(1, "ether")
+            Token.calculate_gas_prices(tokens, 10, price_margin=1.1), [110, None, 4]
         )
 
+    def test_token_eth_value_cached(self):
         token = TokenFactory(fixed_eth_conversion=2.0)
-        self.assertEqual(
-            token.calculate_payment(Web3.to_wei(1, "ether")), Web3.to_wei(0.5, "ether")
-        )
+        with mock.patch.object(
+            Token, "get_eth_value", return_value=2.0, autospec=True
+        ) as get_eth_value_mock:
+            self.assertEqual(
+                token.calculate_payment(ONE_ETHER),
+                HALF_ETHER,
+            )
+            self.assertEqual(token.calculate_gas_price(10), 5)
+            get_eth_value_mock.assert_called_once()
 
-        token = TokenFactory(fixed_eth_conversion=10.0)
-        self.assertEqual(
-            token.calculate_payment(Web3.to_wei(1, "ether")), Web3.to_wei(0.1, "ether")
-        )
+    @override_settings(CACHES=LOCAL_MEMORY_CACHES)
+    def test_token_eth_value_cache(self):
+        cache.clear()
+        token = TokenFactory(fixed_eth_conversion=None, decimals=18)
+        with mock.patch.object(
+            PriceOracleTicker, "get_prices", return_value=[2.0]
+        ) as get_price_mock:
+            self.assertEqual(token.get_eth_value(), 2.0)
+            self.assertEqual(Token.objects.get(pk=token.pk).get_eth_value(), 2.0)
+            get_price_mock.assert_called_once()
 
-        token = TokenFactory(fixed_eth_conversion=0.6512)
-        self.assertEqual(
-            token.calculate_payment(Web3.to_wei(1.23, "ether")), 1888820638820638720
-        )
+            get_price_mock.return_value = [3.0]
+            token.save()  # Cache is invalidated
+            self.assertEqual(token.get_eth_value(), 3.0)
+            self.assertEqual(get_price_mock.call_count, 2)
 
-        token = TokenFactory(fixed_eth_conversion=1.0, decimals=17)
-        self.assertEqual(
-            token.calculate_payment(Web3.to_wei(1, "ether")), Web3.to_wei(0.1, "ether")
+        # Not enough history
+        cache.clear()
+        self.assertEqual(token._get_eth_value_cache_ttl(2.0), ETH_VALUE_CACHE_MIN_TTL)
+        # Stable price
+        self.assertEqual(token._get_eth_value_cache_ttl(2.0), ETH_VALUE_CACHE_MAX_TTL)
+        # Volatile price
+        self.assertEqual(token._get_eth_value_cache_ttl(6.0), 53)
+
+    @override_settings(CACHES=LOCAL_MEMORY_CACHES)
+    def test_token_eth_value_cache_invalidation(self):
+        cache.clear()
+        token = TokenFactory(fixed_eth_conversion=None)
+        cache_key = token._get_eth_value_cache_key()
+
+        cache.set(cache_key, 2.0)
+        price_oracle_ticker = PriceOracleTickerFactory(
+            token=token, price_oracle=self.kraken_oracle
         )
+        self.assertIsNone(cache.get(cache_key))
+
+        cache.set(cache_key, 2.0)
+        self.kraken_oracle.configuration = {"another": "configuration"}
+        self.kraken_oracle.save()
+        self.assertIsNone(cache.get(cache_key))
+
+        cache.set(cache_key, 2.0)
+        price_oracle_ticker.delete()
+        self.assertIsNone(cache.get(cache_key))
+
+        price_oracle = PriceOracle.objects.create(name="Test")
+        PriceOracleTickerFactory(token=token, price_oracle=price_oracle)
+        cache.set(cache_key, 2.0)
+        price_oracle.delete()
+        self.assertIsNone(cache.get(cache_key))
 
     @mock.patch.object(Kraken, "get_price", return_value=3.8, autospec=True)
     def test_token_eth_value(self, get_price_mock):
-        price_oracle = PriceOracle.objects.get(name="Kraken")
+        price_oracle = self.kraken_oracle
         token = TokenFactory(fixed_eth_conversion=None)
         with self.assertRaises(CannotGetTokenPriceFromApi):
             token.get_eth_value()
@@ -57,23 +166,41 @@ class TestModels(TestCase):
             price_oracle=price_oracle,
             ticker="0xdd974D5C2e2928deA5F71b9825b8b646686BD200-WETH",
         )
-        price = token.get_eth_value()
-        self.assertIsInstance(price, float)
-        self.assertGreater(price, 0.0)
+        self.assertEqual(token.get_eth_value(), 3.8)
         PriceOracleTickerFactory(
             token=token, price_oracle=price_oracle, ticker="BADTICKER"
         )
-        price = token.get_eth_value()
-        self.assertIsInstance(price, float)
-        self.assertGreater(price, 0.0)
+        self.assertEqual(token.get_eth_value(), 3.8)
 
         token = TokenFactory(fixed_eth_conversion=None)
         with self.assertRaises(CannotGetTokenPriceFromApi):
             token.get_eth_value()
 
+    @mock.patch.object(Kraken, "get_price", return_value=3.8, autospec=True)
+    def test_token_eth_value_queries(self, get_price_mock):
+        price_oracle = self.kraken_oracle
+        token = TokenFactory(fixed_eth_conversion=None)
+        for ticker in ("ETHEUR", "GNOEUR", "GNOETH"):
+            PriceOracleTickerFactory(
+                token=token, price_oracle=price_oracle, ticker=ticker
+            )
+
+        token = Token.objects.get(address=token.address)
+        with self.assertNumQueries(1):
+            token.get_eth_value()
+
+        token = Token.objects.with_price_oracle_tickers().get(address=token.address)
+        with self.assertNumQueries(0):
+            token.get_eth_value()
+
+        # Kraken rejected the batch request, so every ticker was queried using
+        # `get_price`
+        self.http_session_get_mock.assert_called()
+        self.assertEqual(get_price_mock.call_count, 6)
+
     @mock.patch.object(Kraken, "get_price", return_value=3.8, autospec=True)
     def test_token_eth_value_inverted(self, get_price_mock):
-        price_oracle = PriceOracle.objects.get(name="Kraken")
+        price_oracle = self.kraken_oracle
 
         token = TokenFactory(fixed_eth_conversion=None)
         PriceOracleTickerFactory(
@@ -92,22 +219,191 @@ class TestModels(TestCase):
         )
         price_inverted = token.get_eth_value()
 
-        self.assertAlmostEqual(1 / price, price_inverted, delta=10.0)
+        self.assertEqual(price, 3.8)
+        self.assertAlmostEqual(1 / price, price_inverted)
 
-    def test_token_eth_value_with_fixed_conversion(self):
-        fixed_eth_conversion = 0.1
-        token = TokenFactory(fixed_eth_conversion=fixed_eth_conversion)
-        self.assertEqual(token.get_eth_value(), fixed_eth_conversion)
+    @mock.patch.object(
+        Kraken,
+        "get_price",
+        side_effect=CannotGetTokenPriceFromApi,
+        autospec=True,
+    )
+    def test_price_oracle_ticker_price_failure(self, get_price_mock):
+        price_oracle = self.kraken_oracle
+        price_oracle_ticker = PriceOracleTickerFactory(
+            price_oracle=price_oracle, ticker="BADTICKER"
+        )
+        self.assertIsNone(price_oracle_ticker.price)
+        # Oracle is not queried again during the cooldown
+        self.assertIsNone(price_oracle_ticker.price)
+        get_price_mock.assert_called_once()
+
+        oracle_failures.clear()
+        self.assertIsNone(price_oracle_ticker.price)
+        self.assertEqual(get_price_mock.call_count, 2)
+
+    @mock.patch.object(
+        Kraken, "get_prices", return_value={"ETHEUR": 4.0, "GNOEUR": 2.0}, autospec=True
+    )
+    def test_token_prefetch_eth_values(self, get_prices_mock):
+        price_oracle = self.kraken_oracle
+        token = TokenFactory(fixed_eth_conversion=None)
+        PriceOracleTickerFactory(
+            token=token, price_oracle=price_oracle, ticker="ETHEUR"
+        )
+        token_2 = TokenFactory(fixed_eth_conversion=None)
+        PriceOracleTickerFactory(
+            token=token_2, price_oracle=price_oracle, ticker="GNOEUR"
+        )
+        token_3 = TokenFactory(fixed_eth_conversion=None)
+        PriceOracleTickerFactory(
+            token=token_3, price_oracle=price_oracle, ticker="BADTICKER"
+        )
+        token_4 = TokenFactory(fixed_eth_conversion=3.0)
+
+        tokens = list(Token.objects.with_price_oracle_tickers())
+        Token.prefetch_eth_values(tokens)
+        get_prices_mock.assert_called_once()
+        self.assertCountEqual(
+            get_prices_mock.call_args.args[1], ["ETHEUR", "GNOEUR", "BADTICKER"]
+        )
+        eth_values = {
+            token.address: token.__dict__.get("eth_value") for token in tokens
+        }
+        self.assertEqual(
+            eth_values,
+            {
+                token.address: 4.0,
+                token_2.address: 2.0,
+                token_3.address: None,
+                token_4.address: 3.0,
+            },
+        )
+
+    @mock.patch.object(
+        Kraken, "get_price", side_effect=CannotConnectToPriceOracle, autospec=True
+    )
+    def test_price_oracle_failure_threshold(self, get_price_mock):
+        price_oracle = self.kraken_oracle
+        price_oracle_tickers = [
+            PriceOracleTickerFactory(price_oracle=price_oracle, ticker=f"BADTICKER{i}")
+            for i in range(ORACLE_FAILURE_THRESHOLD + 1)
+        ]
+        for price_oracle_ticker in price_oracle_tickers[:-1]:
+            self.assertIsNone(price_oracle_ticker.price)
+        self.assertEqual(get_price_mock.call_count, ORACLE_FAILURE_THRESHOLD)
+
+        # Price oracle is not queried during the cooldown
+        self.assertIsNone(price_oracle_tickers[-1].price)
+        self.assertEqual(get_price_mock.call_count, ORACLE_FAILURE_THRESHOLD)
+
+        price_oracle.save()
+        self.assertIsNone(price_oracle_tickers[-1].price)
+        self.assertEqual(get_price_mock.call_count, ORACLE_FAILURE_THRESHOLD + 1)
+
+    @mock.patch.object(
+        Kraken, "get_price", side_effect=CannotConnectToPriceOracle, autospec=True
+    )
+    def test_price_oracle_failure_threshold_many_tickers(self, get_price_mock):
+        price_oracle_tickers = [
+            PriceOracleTickerFactory(price_oracle=self.kraken_oracle, ticker=ticker)
+            for ticker in ("ETHEUR", "GNOEUR", "GNOETH")
+        ]
+        for i in range(1, ORACLE_FAILURE_THRESHOLD + 1):
+            self.assertEqual(
+                PriceOracleTicker.get_prices(price_oracle_tickers), [None] * 3
+            )
+            # Querying stops after the first connection failure
+            self.assertEqual(get_price_mock.call_count, i)
+            # Tickers not queried are not blamed, only the price oracle is
+            self.assertEqual(oracle_failures, {})
+
+        # Price oracle is not queried during the cooldown
+        self.assertIn(self.kraken_oracle.name, price_oracle_failures)
+        self.assertEqual(PriceOracleTicker.get_prices(price_oracle_tickers), [None] * 3)
+        self.assertEqual(get_price_mock.call_count, ORACLE_FAILURE_THRESHOLD)
+
+    @mock.patch.object(
+        Kraken, "get_price", side_effect=CannotGetTokenPriceFromApi, autospec=True
+    )
+    def test_price_oracle_failure_threshold_invalid_tickers(self, get_price_mock):
+        price_oracle_tickers = [
+            PriceOracleTickerFactory(
+                price_oracle=self.kraken_oracle, ticker=f"BADTICKER{i}"
+            )
+            for i in range(ORACLE_FAILURE_THRESHOLD + 1)
+        ]
+        # Price oracle is working, so it's not disabled for the other tickers
+        for price_oracle_ticker in price_oracle_tickers:
+            self.assertIsNone(price_oracle_ticker.price)
+        self.assertEqual(get_price_mock.call_count, ORACLE_FAILURE_THRESHOLD + 1)
+
+
+class TestTokenWithoutDatabase(SimpleTestCase):
+    def test_token_calculate_payment(self):
+        token = TokenFactory.build(fixed_eth_conversion=0.1)
+        self.assertEqual(token.calculate_payment(ONE_ETHER), TEN_ETHER)
+
+        token = TokenFactory.build(fixed_eth_conversion=1.0)
+        self.assertEqual(token.calculate_payment(ONE_ETHER), ONE_ETHER)
 
-        token = TokenFactory(decimals=17, fixed_eth_conversion=fixed_eth_conversion)
-        self.assertEqual(token.get_eth_value(), fixed_eth_conversion * 10)
+        token = TokenFactory.build(fixed_eth_conversion=2.0)
+        self.assertEqual(token.calculate_payment(ONE_ETHER), HALF_ETHER)
 
-        token = TokenFactory(decimals=19, fixed_eth_conversion=fixed_eth_conversion)
-        self.assertEqual(token.get_eth_value(), fixed_eth_conversion / 10)
+        token = TokenFactory.build(fixed_eth_conversion=10.0)
+        self.assertEqual(token.calculate_payment(ONE_ETHER), TENTH_ETHER)
+
+        token = TokenFactory.build(fixed_eth_conversion=0.6512)
+        self.assertEqual(
+            token.calculate_payment(Web3.to_wei(1.23, "ether")), 1888820638820638821
+        )
+
+        token = TokenFactory.build(fixed_eth_conversion=1.0, decimals=17)
+        self.assertEqual(token.calculate_payment(ONE_ETHER), TENTH_ETHER)
+
+    def test_token_calculate_gas_price(self):
+        token = TokenFactory.build(fixed_eth_conversion=0.1)
+        self.assertEqual(
+            token.calculate_gas_price(Web3.to_wei(1, "gwei")), Web3.to_wei(10, "gwei")
+        )
+        self.assertEqual(
+            token.calculate_gas_price(Web3.to_wei(1, "gwei"), price_margin=1.1),
+            Web3.to_wei(11, "gwei"),
+        )
+
+        token = TokenFactory.build(fixed_eth_conversion=3.0)
+        self.assertEqual(token.calculate_gas_price(10), 4)  # Rounded up
+
+    def test_token_conversions_with_tiny_eth_value(self):
+        # Token with more decimals than ether, worth less than 1 wei per unit
+        token = TokenFactory.build(fixed_eth_conversion=None, decimals=40)
+        token.eth_value = 2e-22
+        self.assertEqual(token.calculate_payment(ONE_ETHER), 5 * 10**39)
+        self.assertEqual(token.calculate_gas_price(10), 5 * 10**22)
+        self.assertEqual(token.calculate_gas_price(10, price_margin=1.1), 55 * 10**21)
+        self.assertEqual(
+            Token.calculate_gas_prices([token], 10, price_margin=1.1), [55 * 10**21]
+        )
+
+    def test_token_eth_value_with_fixed_conversion(self):
+        fixed_eth_conversion = 0.1
+        tokens = TokenFactory.build_batch(
+            3,
+            decimals=factory.Iterator([18, 17, 19]),
+            fixed_eth_conversion=fixed_eth_conversion,
+        )
+        self.assertEqual(
+            [token.get_eth_value() for token in tokens],
+            [
+                fixed_eth_conversion,
+                fixed_eth_conversion * 10,
+                fixed_eth_conversion / 10,
+            ],
+        )
 
     def test_token_logo_uri(self):
         logo_uri = ""
-        token = TokenFactory(logo_uri=logo_uri)
+        token = TokenFactory.build(logo_uri=logo_uri)
         self.assertEqual(
             token.get_full_logo_uri(),
             urljoin(
@@ -117,12 +413,13 @@ class TestModels(TestCase):
         )
 
         logo_uri = "hola.gif"
-        token = TokenFactory(logo_uri=logo_uri)
+        token = TokenFactory.build(logo_uri=logo_uri)
         self.assertEqual(
             token.get_full_logo_uri(),
             urljoin(settings.TOKEN_LOGO_BASE_URI, token.logo_uri),
         )
 
         logo_uri = "http://absoluteurl.com/file.jpg"
-        token = TokenFactory(logo_uri=logo_uri)
+        token = TokenFactory.build(logo_uri=logo_uri)
         self.assertEqual(token.get_full_logo_uri(), logo_uri)
+        self.assertEqual(token.full_logo_uri, logo_uri)
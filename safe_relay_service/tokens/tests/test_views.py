@@ -68,3 +68,11 @@ class TestTokenViews(SafeTestCaseMixin, APITestCase):
                 }
             ],
         )
+
+        TokenFactory.create_batch_fast(20, gas=False)
+        response = self.client.get(reverse("v1:tokens"), {"gas": True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(reverse("v1:tokens"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 21)
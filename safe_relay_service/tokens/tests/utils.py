@@ -0,0 +1,5 @@
+# Django cache is disabled for tests (`DummyCache`), these settings can be used with
+# `override_settings` to test caching of prices and eth values
+LOCAL_MEMORY_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
@@ -15,6 +15,9 @@ class TokenView(RetrieveAPIView):
     lookup_field = "address"
     queryset = Token.objects.all()
 
+    def get_queryset(self):
+        return self.get_serializer_class().setup_eager_loading(super().get_queryset())
+
     @method_decorator(cache_page(60 * 5))  # Cache 5 minutes
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -33,6 +36,9 @@ class TokensView(ListAPIView):
     ordering = ("relevance", "name")
     queryset = Token.objects.all()
 
+    def get_queryset(self):
+        return self.get_serializer_class().setup_eager_loading(super().get_queryset())
+
     @method_decorator(cache_page(60 * 5))  # Cache 5 minutes
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
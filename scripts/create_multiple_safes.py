@@ -1,5 +1,6 @@
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 import requests
@@ -13,6 +14,8 @@ logging.basicConfig(
 )
 
 w3 = Web3(HTTPProvider("https://rinkeby.infura.io/gnosis"))
+# Reuse connections to the relay service between requests
+session = requests.Session()
 
 parser = argparse.ArgumentParser()
 parser.add_argument("number", help="number of safes to create", type=int)
@@ -50,35 +53,48 @@ def generate_payload(owners, threshold=None):
     }
 
 
+def create_safe(owners):
+    r = session.post(SAFES_URL, json=generate_payload(owners))
+    assert r.ok
+    safe_created = r.json()
+    safe_address = safe_created["safe"]
+    payment = int(safe_created["payment"])
+    logging.info("Created safe=%s, need payment=%d", safe_address, payment)
+    return safe_address, payment
+
+
+def notify_safe(safe_address):
+    r = session.put(get_safes_notify_url(safe_address))
+    assert r.ok
+
+
 def notify_safes():
     with open("safes.txt", mode="r") as safes_file:
-        for safe_address in safes_file:
-            r = requests.put(get_safes_notify_url(safe_address.strip()))
-            assert r.ok
+        safe_addresses = (line.strip() for line in safes_file)
+        for safe_address in filter(None, safe_addresses):
+            notify_safe(safe_address)
 
 
 def deploy_safes(number, owners, private_key):
     funder = Account.from_key(private_key)
     safes = []
-    funder_nonce = w3.eth.getTransactionCount(funder.address, "pending")
-    for _ in range(number):
-        payload_json = generate_payload(owners)
-        r = requests.post(SAFES_URL, json=payload_json)
-        assert r.ok
-        safe_created = r.json()
-        safe_address = safe_created["safe"]
-        payment = int(safe_created["payment"])
-
-        logging.info("Created safe=%s, need payment=%d", safe_address, payment)
-        send_eth(private_key, safe_address, payment, funder_nonce)
-        logging.info("Sent payment=%s to safe=%s", payment, safe_address)
-        r = requests.put(get_safes_notify_url(safe_address))
-        assert r.ok
-        funder_nonce += 1
-        safes.append(safe_address)
-
-    with open("safes.txt", mode="a") as safes_file:
-        safes_file.write("\n".join(safes))
+    with ThreadPoolExecutor(max_workers=8) as executor, open(
+        "safes.txt", mode="a"
+    ) as safes_file:
+        # Requests to the relay service are independent, but payments are sent
+        # sequentially as they use consecutive nonces of the funder
+        safes_with_payment = list(executor.map(create_safe, [owners] * number))
+        funder_nonce = w3.eth.getTransactionCount(funder.address, "pending")
+        for safe_address, payment in safes_with_payment:
+            send_eth(private_key, safe_address, payment, funder_nonce)
+            logging.info("Sent payment=%s to safe=%s", payment, safe_address)
+            funder_nonce += 1
+            safes.append(safe_address)
+            # Store funded safes as soon as possible, so they can be notified later
+            # using `notify_safes` if the script fails
+            safes_file.write(safe_address + "\n")
+            safes_file.flush()
+        list(executor.map(notify_safe, safes))
 
 
 # notify_safes()